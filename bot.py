@@ -8,8 +8,12 @@ Parses messages directly without requiring commands (except /start and /help).
 Uses webhook mode for Render.com deployment.
 """
 
+import asyncio
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 from aiohttp import web
 from dotenv import load_dotenv
@@ -24,10 +28,10 @@ from telegram.ext import (
 )
 
 from core import (
-    load_lexicon,
+    load_indexed_lexicon,
+    normalize_query,
     get_search_params,
     filter_words,
-    sort_by_frequency,
 )
 
 # Configure logging
@@ -48,13 +52,42 @@ if not TELEGRAM_TOKEN:
 # Load lexicon once at startup (global)
 logger.info("Loading lexicon...")
 try:
-    WORDS, FREQ_MAP = load_lexicon('data/lexicon_ru_5.jsonl.gz')
+    WORDS, FREQ_MAP, WORD_INDEX = load_indexed_lexicon('data/lexicon_ru_5.jsonl.gz')
     logger.info(f"Loaded {len(WORDS)} words")
 except Exception as e:
     logger.error(f"Failed to load lexicon: {e}")
     exit(1)
 
 
+# Words shown in a reply; the cache keeps only these per query
+MAX_DISPLAY_WORDS = 50
+
+
+@lru_cache(maxsize=4096)
+def _search(query: str) -> Tuple[int, List[str], Dict]:
+    """Run parse + filter for a normalized query (results are shared, don't mutate)."""
+    params = get_search_params(query)
+    if params['conflicts']:
+        return 0, [], params
+
+    filtered_words, _ = filter_words(
+        WORDS,
+        params['must_have'],
+        params['excluded'],
+        params['pattern'],
+        params['antipattern_constraints'],
+        index=WORD_INDEX,
+    )
+
+    # Keep cache entries small: total count plus the words that get displayed
+    return len(filtered_words), filtered_words[:MAX_DISPLAY_WORDS], params
+
+
+def cached_search(text: str) -> Tuple[int, List[str], Dict]:
+    """Search with results cached by normalized query (users often repeat queries)."""
+    return _search(normalize_query(text))
+
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Send welcome message when /start is issued."""
     welcome_text = """
@@ -113,78 +146,60 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     await update.message.reply_text(help_text, parse_mode='Markdown')
 
 
-async def search_words(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Parse message text and return matching words."""
-    text = update.message.text.strip()
+def format_params(params: Dict) -> List[str]:
+    """Format search parameters as Markdown reply lines."""
+    lines = []
+    if params['excluded']:
+        lines.append(f"  Серые: `{''.join(sorted(params['excluded']))}`")
+    if params['must_have']:
+        lines.append(f"  Жёлтые: `{''.join(sorted(params['must_have']))}`")
+    if params['pattern']:
+        lines.append(f"  Паттерн: `{params['pattern']}`")
+    if params['raw_antipattern']:
+        lines.append(f"  Антипаттерн: `{params['raw_antipattern']}`")
+    return lines
 
-    if not text:
-        await update.message.reply_text("Пустой запрос. Используй /help для справки.")
-        return
 
-    # Parse search parameters
-    params = get_search_params(text)
+def do_search_sync(text: str) -> str:
+    """Run the search for a query and format the Markdown reply (CPU-bound)."""
+    # Parse and filter (cached); WORDS are presorted by frequency
+    total, display_words, params = cached_search(text)
 
     # Check for conflicts
     if params['conflicts']:
-        conflict_msg = "❌ *Конфликты в параметрах:*\n\n"
-        for msg in params['conflicts']:
-            conflict_msg += f"• {msg}\n"
-        conflict_msg += "\nПроверь параметры и попробуй снова."
-        await update.message.reply_text(conflict_msg, parse_mode='Markdown')
-        return
-
-    # Filter words
-    filtered_words, fstats = filter_words(
-        WORDS,
-        params['must_have'],
-        params['excluded'],
-        params['pattern'],
-        params['antipattern_constraints']
-    )
-
-    # Sort by frequency
-    if FREQ_MAP:
-        filtered_words = sort_by_frequency(filtered_words, FREQ_MAP)
+        parts = ["❌ *Конфликты в параметрах:*", ""]
+        parts.extend(f"• {msg}" for msg in params['conflicts'])
+        parts.extend(["", "Проверь параметры и попробуй снова."])
+        return "\n".join(parts)
 
     # Format response
-    total = len(filtered_words)
-
     if total == 0:
-        response = "😕 *Слова не найдены*\n\n"
-        response += "*Параметры поиска:*\n"
-        if params['excluded']:
-            response += f"  Серые: `{''.join(sorted(params['excluded']))}`\n"
-        if params['must_have']:
-            response += f"  Жёлтые: `{''.join(sorted(params['must_have']))}`\n"
-        if params['pattern']:
-            response += f"  Паттерн: `{params['pattern']}`\n"
-        if params['raw_antipattern']:
-            response += f"  Антипаттерн: `{params['raw_antipattern']}`\n"
-        await update.message.reply_text(response, parse_mode='Markdown')
-        return
+        parts = ["😕 *Слова не найдены*", "", "*Параметры поиска:*"]
+        parts.extend(format_params(params))
+        return "\n".join(parts) + "\n"
 
-    # Limit output to 50 words
-    max_words = 50
-    display_words = filtered_words[:max_words]
+    parts = [f"✅ *Найдено: {total} {'слово' if total == 1 else 'слов' if total < 5 else 'слов'}*", ""]
+    parts.extend(f"{i}. `{word}`" for i, word in enumerate(display_words, 1))
 
-    response = f"✅ *Найдено: {total} {'слово' if total == 1 else 'слов' if total < 5 else 'слов'}*\n\n"
+    if total > MAX_DISPLAY_WORDS:
+        parts.extend(["", f"_...и ещё {total - MAX_DISPLAY_WORDS} слов_"])
 
-    for i, word in enumerate(display_words, 1):
-        response += f"{i}. `{word}`\n"
+    parts.extend(["", "*Параметры:*"])
+    parts.extend(format_params(params))
 
-    if total > max_words:
-        response += f"\n_...и ещё {total - max_words} слов_\n"
+    return "\n".join(parts) + "\n"
 
-    response += "\n*Параметры:*\n"
-    if params['excluded']:
-        response += f"  Серые: `{''.join(sorted(params['excluded']))}`\n"
-    if params['must_have']:
-        response += f"  Жёлтые: `{''.join(sorted(params['must_have']))}`\n"
-    if params['pattern']:
-        response += f"  Паттерн: `{params['pattern']}`\n"
-    if params['raw_antipattern']:
-        response += f"  Антипаттерн: `{params['raw_antipattern']}`\n"
 
+async def search_words(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Parse message text and return matching words."""
+    text = update.message.text.strip()
+
+    if not text:
+        await update.message.reply_text("Пустой запрос. Используй /help для справки.")
+        return
+
+    # Search in a worker thread so other chats aren't blocked meanwhile
+    response = await asyncio.to_thread(do_search_sync, text)
     await update.message.reply_text(response, parse_mode='Markdown')
 
 
@@ -199,19 +214,56 @@ async def health(request):
 
 
 async def webhook(request):
-    """Handle incoming Telegram updates."""
+    """Queue incoming Telegram update and acknowledge it immediately."""
     application = request.app['bot_app']
     update = Update.de_json(await request.json(), application.bot)
-    await application.process_update(update)
+
+    # Same chat → same queue, so updates of one chat stay in order
+    queues = request.app['update_queues']
+    chat = update.effective_chat
+    key = chat.id if chat else update.update_id
+    queues[key % len(queues)].put_nowait(update)
     return web.Response()
 
 
+# Seconds to wait for queued updates on shutdown
+SHUTDOWN_TIMEOUT = 20
+
+
+async def update_worker(application, queue):
+    """Process queued updates one by one."""
+    while True:
+        update = await queue.get()
+        try:
+            await application.process_update(update)
+        except Exception as e:
+            logger.error(f"Failed to process update {update.update_id}: {e}")
+        finally:
+            queue.task_done()
+
+
 async def on_startup(app):
     """Initialize bot on startup."""
+    # Worker threads for searches (asyncio.to_thread uses the default executor)
+    search_threads = app['search_threads']
+    app['search_executor'] = ThreadPoolExecutor(
+        max_workers=search_threads, thread_name_prefix='search'
+    )
+    asyncio.get_running_loop().set_default_executor(app['search_executor'])
+    logger.info(f"Search threads: {search_threads}")
+
     application = app['bot_app']
     await application.initialize()
     await application.start()
 
+    # Update workers (webhook only enqueues)
+    app['update_queues'] = [asyncio.Queue() for _ in range(app['update_workers'])]
+    app['update_tasks'] = [
+        asyncio.create_task(update_worker(application, queue))
+        for queue in app['update_queues']
+    ]
+    logger.info(f"Update workers: {app['update_workers']}")
+
     webhook_url = app['webhook_url']
     await application.bot.set_webhook(webhook_url)
     logger.info(f"Webhook set to {webhook_url}")
@@ -219,10 +271,29 @@ async def on_startup(app):
 
 async def on_shutdown(app):
     """Cleanup on shutdown."""
+    # Updates were already acknowledged to Telegram, so finish queued ones first
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(queue.join() for queue in app['update_queues'])),
+            timeout=SHUTDOWN_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        pending = sum(queue.qsize() for queue in app['update_queues'])
+        logger.warning(
+            f"Shutdown timeout after {SHUTDOWN_TIMEOUT}s: unprocessed updates dropped "
+            f"({pending} still queued)"
+        )
+
+    for task in app['update_tasks']:
+        task.cancel()
+    await asyncio.gather(*app['update_tasks'], return_exceptions=True)
+
     application = app['bot_app']
     await application.stop()
     await application.shutdown()
 
+    app['search_executor'].shutdown(wait=True)
+
 
 def main():
     """Start the bot."""
@@ -231,11 +302,21 @@ def main():
     # Get configuration from environment
     port = int(os.getenv('PORT', 10000))
     webhook_url = os.getenv('RENDER_EXTERNAL_URL')  # Auto-provided by Render.com
+    search_threads = int(os.getenv('SEARCH_THREADS', os.cpu_count() or 1))
+    update_workers = int(os.getenv('UPDATE_WORKERS', 4))
 
     if not webhook_url:
         logger.error("RENDER_EXTERNAL_URL not set! Are you running on Render.com?")
         exit(1)
 
+    if search_threads < 1:
+        logger.error("SEARCH_THREADS must be at least 1")
+        exit(1)
+
+    if update_workers < 1:
+        logger.error("UPDATE_WORKERS must be at least 1")
+        exit(1)
+
     # Create PTB application
     application = Application.builder().token(TELEGRAM_TOKEN).build()
 
@@ -249,6 +330,8 @@ def main():
     app = web.Application()
     app['bot_app'] = application
     app['webhook_url'] = webhook_url
+    app['search_threads'] = search_threads
+    app['update_workers'] = update_workers
 
     # Routes
     app.router.add_get('/health', health)
@@ -6,11 +6,14 @@ Core library for 5-letter Russian word search.
 Provides lexicon loading, input parsing, and word filtering functionality.
 """
 
-from .lexicon import load_lexicon, get_lexicon_stats
+from .lexicon import load_lexicon, get_lexicon_stats, letters_mask
+from .index import build_word_index, load_indexed_lexicon, save_prebuilt_lexicon
 from .parser import (
     parse_input,
     parse_antipattern,
+    compile_pattern,
     check_conflicts,
+    normalize_query,
     get_search_params,
 )
 from .search import (
@@ -23,10 +26,17 @@ __all__ = [
     # Lexicon
     'load_lexicon',
     'get_lexicon_stats',
+    'letters_mask',
+    # Index
+    'build_word_index',
+    'load_indexed_lexicon',
+    'save_prebuilt_lexicon',
     # Parser
     'parse_input',
     'parse_antipattern',
+    'compile_pattern',
     'check_conflicts',
+    'normalize_query',
     'get_search_params',
     # Search
     'filter_words',
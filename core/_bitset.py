@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bitsets over word indices stored as Python integers.
+Bit i is set when word i belongs to the set; AND/OR/popcount run in C.
+"""
+
+from typing import Iterable, List
+
+# Set bit positions of every byte value
+_BYTE_BITS = [tuple(b for b in range(8) if value >> b & 1) for value in range(256)]
+
+
+def ids_to_bits(ids: Iterable[int], size: int) -> int:
+    """
+    Build a bitset from word indices.
+
+    Args:
+        ids: Word indices (each < size)
+        size: Total number of words
+
+    Returns:
+        Integer bitset
+    """
+    buf = bytearray((size + 7) // 8)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def bits_to_ids(bits: int) -> List[int]:
+    """
+    Expand a bitset into sorted word indices.
+
+    Args:
+        bits: Integer bitset
+
+    Returns:
+        List of indices of set bits, ascending
+    """
+    ids: List[int] = []
+    base = 0
+    for byte in bits.to_bytes((bits.bit_length() + 7) // 8, 'little'):
+        if byte:
+            ids.extend([base + b for b in _BYTE_BITS[byte]])
+        base += 8
+    return ids
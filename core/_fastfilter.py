@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Filter kernel over precomputed word arrays.
+Works on word indices only; mapping back to words is done by the caller.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+from ._bitset import bits_to_ids
+from .parser import WILDCARD_CODE
+
+
+def _mask_codes(mask: int) -> List[int]:
+    """Return letter codes of the bits set in a letter mask."""
+    return [code for code in range(mask.bit_length()) if mask >> code & 1]
+
+
+def filter_kernel(
+    size: int,
+    letter_bits: Sequence[int],
+    position_bits: Sequence[Sequence[int]],
+    excluded_mask: int,
+    must_mask: int,
+    pattern_codes: bytes,
+    forbidden_masks: Sequence[int],
+) -> Tuple[List[int], Dict[str, int]]:
+    """
+    Select indices of words matching the compiled search criteria.
+
+    All filters are evaluated on whole-lexicon bitsets: one big-integer
+    AND/OR per letter or (position, letter) pair, with statistics taken
+    from bit counts. Words are only visited when the final bitset is
+    expanded into indices. Words are counted by the first filter that
+    rejects them.
+
+    Args:
+        size: Number of words
+        letter_bits: Bitset of words containing each letter, by letter code
+        position_bits: Bitset of words by [position][letter code]
+        excluded_mask: Bitmask of excluded letters
+        must_mask: Bitmask of required letters
+        pattern_codes: Per-position letter codes (WILDCARD_CODE for '_')
+        forbidden_masks: Per-position bitmasks of banned letters
+
+    Returns:
+        Tuple of (matching word indices in input order, filter statistics dict)
+    """
+    stats = {"must_have": 0, "excluded": 0, "pattern": 0, "antipattern": 0}
+
+    # Decide once which filters are active
+    excluded_codes = _mask_codes(excluded_mask)
+    must_codes = _mask_codes(must_mask)
+    fixed = [(pos, code) for pos, code in enumerate(pattern_codes) if code != WILDCARD_CODE]
+    bans = [(pos, mask & ~excluded_mask) for pos, mask in enumerate(forbidden_masks)
+            if mask & ~excluded_mask]
+
+    keep = (1 << size) - 1
+    count = size
+
+    # Filter: excluded letters
+    if excluded_codes:
+        excluded_bits = 0
+        for code in excluded_codes:
+            excluded_bits |= letter_bits[code]
+        keep &= ~excluded_bits
+        count = keep.bit_count()
+        stats["excluded"] = size - count
+
+    # Filter: must_have letters (stop once no candidates are left)
+    if must_codes and keep:
+        for code in must_codes:
+            keep &= letter_bits[code]
+            if not keep:
+                break
+        count, previous = keep.bit_count(), count
+        stats["must_have"] = previous - count
+
+    # Filter: pattern (green positions)
+    if fixed and keep:
+        for pos, code in fixed:
+            keep &= position_bits[pos][code]
+        count, previous = keep.bit_count(), count
+        stats["pattern"] = previous - count
+
+    # Filter: antipattern (positional bans not already covered by excluded)
+    if bans and keep:
+        for pos, banned in bans:
+            banned_bits = 0
+            for code in _mask_codes(banned):
+                banned_bits |= position_bits[pos][code]
+            keep &= ~banned_bits
+        stats["antipattern"] = count - keep.bit_count()
+
+    ids = bits_to_ids(keep)
+
+    return ids, stats
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Inverted index over the lexicon.
+Maps letters and (position, letter) pairs to bitsets of word indices.
+Can be prebuilt and stored as a pickle next to the lexicon.
+"""
+
+import os
+import pickle
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ._bitset import ids_to_bits
+from .lexicon import UNKNOWN_CODE, letter_codes, load_lexicon
+
+WORD_LENGTH = 5
+
+# Bump when the index layout changes so stale prebuilt files are ignored
+INDEX_VERSION = 2
+
+
+def build_word_index(words: Sequence[str]) -> Dict[str, list]:
+    """
+    Precompute posting bitsets used by filter_words.
+
+    Args:
+        words: List of words (as returned by load_lexicon)
+
+    Returns:
+        Dictionary with:
+        - size: number of indexed words
+        - letter_bits: bitset of words containing each letter, indexed by letter code
+        - position_bits: bitset of words with a given letter at a given position,
+          indexed as [position][letter code]
+    """
+    letter_ids: List[List[int]] = [[] for _ in range(UNKNOWN_CODE + 1)]
+    position_ids: List[List[List[int]]] = [
+        [[] for _ in range(UNKNOWN_CODE + 1)] for _ in range(WORD_LENGTH)
+    ]
+    for i, word in enumerate(words):
+        for pos, code in enumerate(letter_codes(word)):
+            position_ids[pos][code].append(i)
+            # Repeated letters: the word is already the last entry
+            ids = letter_ids[code]
+            if not ids or ids[-1] != i:
+                ids.append(i)
+
+    size = len(words)
+    return {
+        'size': size,
+        'letter_bits': [ids_to_bits(ids, size) for ids in letter_ids],
+        'position_bits': [
+            [ids_to_bits(ids, size) for ids in pos_ids] for pos_ids in position_ids
+        ],
+    }
+
+
+def get_prebuilt_path(lexicon_path: str) -> str:
+    """
+    Get path of the prebuilt index for a lexicon file.
+
+    Args:
+        lexicon_path: Path to lexicon file (e.g., data/lexicon_ru_5.jsonl.gz)
+
+    Returns:
+        Path with the lexicon extension replaced by .pkl (e.g., data/lexicon_ru_5.pkl)
+    """
+    base = lexicon_path
+    for ext in ('.gz', '.jsonl', '.json'):
+        if base.endswith(ext):
+            base = base[:-len(ext)]
+    return base + '.pkl'
+
+
+def save_prebuilt_lexicon(lexicon_path: str, prebuilt_path: Optional[str] = None) -> str:
+    """
+    Load lexicon, build its index and store both as a pickle.
+
+    Args:
+        lexicon_path: Path to lexicon file
+        prebuilt_path: Output path (default: derived from lexicon_path)
+
+    Returns:
+        Path of the written file
+    """
+    prebuilt_path = prebuilt_path or get_prebuilt_path(lexicon_path)
+    words, freq_map = load_lexicon(lexicon_path)
+    data = {
+        'version': INDEX_VERSION,
+        'words': words,
+        'freq_map': freq_map,
+        'index': build_word_index(words),
+    }
+    # Write to a temp file and swap it in, so an interrupted build never
+    # leaves a truncated pickle behind
+    tmp_path = prebuilt_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, prebuilt_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return prebuilt_path
+
+
+def load_indexed_lexicon(
+    lexicon_path: str = "data/lexicon_ru_5.jsonl.gz",
+) -> Tuple[List[str], Dict[str, float], Dict[str, list]]:
+    """
+    Load words, frequencies and word index.
+
+    Uses the prebuilt pickle (see scripts/build_lexicon.py) when it exists,
+    can be read, has the current INDEX_VERSION and is not older than the
+    lexicon file. Otherwise loads the lexicon and builds the index.
+
+    Args:
+        lexicon_path: Path to lexicon file (default: data/lexicon_ru_5.jsonl.gz)
+
+    Returns:
+        Tuple of (list of words, frequency map, word index)
+
+    Raises:
+        FileNotFoundError: If neither prebuilt nor lexicon file exists
+    """
+    prebuilt_path = get_prebuilt_path(lexicon_path)
+    if os.path.exists(prebuilt_path) and (
+        not os.path.exists(lexicon_path)
+        or os.path.getmtime(prebuilt_path) >= os.path.getmtime(lexicon_path)
+    ):
+        start_time = time.time()
+        try:
+            with open(prebuilt_path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable prebuilt index {prebuilt_path}: {e}")
+        else:
+            if isinstance(data, dict) and data.get('version') == INDEX_VERSION:
+                elapsed = time.time() - start_time
+                print(f"Loaded {len(data['words'])} words from prebuilt {prebuilt_path} in {elapsed:.2f}s")
+                return data['words'], data['freq_map'], data['index']
+            print(f"Ignoring outdated prebuilt index: {prebuilt_path}")
+
+    words, freq_map = load_lexicon(lexicon_path)
+    return words, freq_map, build_word_index(words)
@@ -7,10 +7,30 @@ Loads words from JSONL.gz format with frequency data.
 """
 
 import gzip
-import json
 import os
 import time
-from typing import Dict, List, Tuple
+from functools import reduce
+from operator import or_
+from typing import Dict, Iterable, List, Tuple
+
+import orjson
+
+# Russian alphabet; 'ё' is kept so that raw user input still maps to a bit
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщъыьэюяё'
+
+# Letter → bit index (0..32)
+LETTER_INDEX: Dict[str, int] = {ch: i for i, ch in enumerate(ALPHABET)}
+
+# Lowercase Cyrillic and fold ё → е in a single str.translate pass
+_NORM_TABLE = str.maketrans({
+    **{ch.upper(): ch for ch in ALPHABET},
+    'ё': 'е',
+    'Ё': 'е',
+})
+
+# Code/bit for characters outside the alphabet (never used by lexicon words)
+UNKNOWN_CODE = len(ALPHABET)
+UNKNOWN_BIT = 1 << UNKNOWN_CODE
 
 
 def load_lexicon(lexicon_path: str = "data/lexicon_ru_5.jsonl.gz") -> Tuple[List[str], Dict[str, float]]:
@@ -21,7 +41,8 @@ def load_lexicon(lexicon_path: str = "data/lexicon_ru_5.jsonl.gz") -> Tuple[List
         lexicon_path: Path to lexicon file (default: data/lexicon_ru_5.jsonl.gz)
 
     Returns:
-        Tuple of (list of words, frequency map {word: zipf_score})
+        Tuple of (list of words, frequency map {word: zipf_score}).
+        Words are ordered by frequency (most frequent first) when available.
 
     Raises:
         FileNotFoundError: If lexicon file doesn't exist
@@ -33,19 +54,17 @@ def load_lexicon(lexicon_path: str = "data/lexicon_ru_5.jsonl.gz") -> Tuple[List
     start_time = time.time()
 
     open_fn = gzip.open if lexicon_path.endswith('.gz') else open
-    words_raw: List[str] = []
+    seen: Dict[str, None] = {}  # insertion-ordered set of unique words
     freq_map: Dict[str, float] = {}
     total_lines = 0
 
-    with open_fn(lexicon_path, 'rt', encoding='utf-8') as f:
+    with open_fn(lexicon_path, 'rb') as f:
         for line in f:
             total_lines += 1
-            line = line.strip()
-            if not line:
-                continue
 
+            # orjson parses UTF-8 bytes directly; blank lines fail and are skipped
             try:
-                obj = json.loads(line)
+                obj = orjson.loads(line)
             except Exception:
                 continue
 
@@ -54,8 +73,8 @@ def load_lexicon(lexicon_path: str = "data/lexicon_ru_5.jsonl.gz") -> Tuple[List
                 continue
 
             # Normalize: lowercase and ё → е
-            w = w.lower().replace('ё', 'е')
-            words_raw.append(w)
+            w = w.translate(_NORM_TABLE)
+            seen[w] = None
 
             # Store frequency (Zipf score)
             z = obj.get('zipf')
@@ -65,13 +84,11 @@ def load_lexicon(lexicon_path: str = "data/lexicon_ru_5.jsonl.gz") -> Tuple[List
                 if prev is None or z > prev:
                     freq_map[w] = float(z)
 
-    # Deduplicate while preserving order
-    seen = set()
-    all_words = []
-    for w in words_raw:
-        if w not in seen:
-            seen.add(w)
-            all_words.append(w)
+    all_words = list(seen)
+
+    # Order by frequency once, so filtered results come out sorted
+    if freq_map:
+        all_words.sort(key=lambda w: (-freq_map.get(w, -100.0), w))
 
     elapsed = time.time() - start_time
     print(f"Loaded {len(all_words)} unique 5-letter words from {total_lines} lines in {elapsed:.2f}s")
@@ -79,6 +96,49 @@ def load_lexicon(lexicon_path: str = "data/lexicon_ru_5.jsonl.gz") -> Tuple[List
     return (all_words, freq_map)
 
 
+def letters_mask(letters: Iterable[str]) -> int:
+    """
+    Convert letters to a bitmask over ALPHABET.
+
+    Args:
+        letters: Letters to include in the mask
+
+    Returns:
+        Integer bitmask (characters outside the alphabet map to UNKNOWN_BIT)
+    """
+    return reduce(or_, (1 << LETTER_INDEX[ch] if ch in LETTER_INDEX else UNKNOWN_BIT
+                        for ch in letters), 0)
+
+
+def mask_letters(mask: int) -> List[str]:
+    """
+    Convert a bitmask back to letters in alphabet order.
+
+    Args:
+        mask: Bitmask over ALPHABET
+
+    Returns:
+        List of letters ('?' stands for UNKNOWN_BIT)
+    """
+    letters = [ch for i, ch in enumerate(ALPHABET) if mask >> i & 1]
+    if mask & UNKNOWN_BIT:
+        letters.append('?')
+    return letters
+
+
+def letter_codes(word: str) -> bytes:
+    """
+    Encode a word as one byte per letter (index in ALPHABET).
+
+    Args:
+        word: Word to encode
+
+    Returns:
+        Bytes of letter codes (characters outside the alphabet map to UNKNOWN_CODE)
+    """
+    return bytes(LETTER_INDEX.get(ch, UNKNOWN_CODE) for ch in word)
+
+
 def get_lexicon_stats(words: List[str], freq_map: Dict[str, float]) -> Dict:
     """
     Get statistics about loaded lexicon.
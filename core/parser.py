@@ -6,7 +6,26 @@ Input parsing module for 5-letter word search.
 Handles smart argument parsing with flexible order.
 """
 
-from typing import Dict, List, Optional, Set
+import re
+from typing import AbstractSet, Dict, List, Optional, Sequence, Set, Tuple
+
+from .lexicon import LETTER_INDEX, UNKNOWN_BIT, UNKNOWN_CODE, letters_mask, mask_letters
+
+# Pattern code for an unconstrained ('_') position
+WILDCARD_CODE = 0xFF
+
+# Classifies one whitespace-separated argument per match; alternatives are
+# tried in the same order as the rules in parse_input's docstring
+_TOKEN_RE = re.compile(
+    r'(?<!\S)(?:'
+    r'--\S*'                                # flags like --help (ignored)
+    r'|-(?P<excluded>\S*)'                  # -abc
+    r'|\+(?P<included>\S*)'                 # +def
+    r'|(?P<pattern>(?=\S*_)\S{5})(?!\S)'    # _a___ (exactly 5 characters)
+    r'|(?P<antipattern>(?=\S*\d)\S+)'       # 1a5b
+    r'|\S+'                                 # anything else (ignored)
+    r')'
+)
 
 
 def parse_antipattern(antipattern: Optional[str]) -> Optional[List[Optional[Set[str]]]]:
@@ -43,7 +62,7 @@ def parse_antipattern(antipattern: Optional[str]) -> Optional[List[Optional[Set[
         current_letters: List[str] = []
 
         for ch in antipattern:
-            if ch.isdigit():
+            if ch.isdecimal():
                 # Save previous position
                 if current_pos is not None and current_letters:
                     idx = current_pos - 1  # positions 1-5 → indices 0-4
@@ -71,54 +90,107 @@ def parse_antipattern(antipattern: Optional[str]) -> Optional[List[Optional[Set[
     return constraints
 
 
-def check_conflicts(
+def antipattern_masks(
+    antipattern_constraints: Optional[List[Optional[Set[str]]]],
+) -> List[int]:
+    """
+    Convert antipattern constraints to per-position bitmasks.
+
+    Args:
+        antipattern_constraints: Parsed antipattern constraints or None
+
+    Returns:
+        List of 5 bitmasks of letters forbidden at each position (0 = no bans)
+    """
+    if not antipattern_constraints:
+        return [0] * 5
+    return [letters_mask(banned) if banned else 0 for banned in antipattern_constraints]
+
+
+def compile_pattern(
     pattern: Optional[str],
-    must_have: Set[str],
+    antipattern_constraints: Optional[List[Optional[Set[str]]]],
     excluded: Set[str],
-    antipattern_constraints: Optional[List[Optional[Set[str]]]]
+) -> Tuple[bytes, List[int]]:
+    """
+    Compile pattern and antipattern into per-position codes and masks.
+
+    Args:
+        pattern: Pattern string (e.g., "__а__") or None
+        antipattern_constraints: Parsed antipattern constraints or None
+        excluded: Set of excluded letters
+
+    Returns:
+        Tuple of (pattern codes: 5 bytes, WILDCARD_CODE for '_';
+                  forbidden masks: 5 bitmasks of letters banned at each position)
+    """
+    if pattern:
+        pattern_codes = bytes(
+            WILDCARD_CODE if ch == '_' else LETTER_INDEX.get(ch, UNKNOWN_CODE)
+            for ch in pattern
+        )
+    else:
+        pattern_codes = bytes([WILDCARD_CODE] * 5)
+
+    excluded_mask = letters_mask(excluded)
+    forbidden_masks = [mask | excluded_mask for mask in antipattern_masks(antipattern_constraints)]
+
+    return pattern_codes, forbidden_masks
+
+
+def check_conflicts(
+    pattern: Optional[str],
+    must_mask: int,
+    excluded_mask: int,
+    position_bans: Sequence[int],
+    must_have_other: AbstractSet[str] = frozenset(),
 ) -> List[str]:
     """
     Check for conflicts in search parameters.
 
+    Characters outside the alphabet share UNKNOWN_BIT in the masks, so they
+    can't be told apart and are left out of the letter checks (no lexicon
+    word contains them anyway). Required ones still take up free positions
+    and are passed separately as must_have_other.
+
     Args:
-        pattern: Pattern string (e.g., "__а__")
-        must_have: Set of required letters
-        excluded: Set of excluded letters
-        antipattern_constraints: Parsed antipattern constraints
+        pattern: Pattern string (e.g., "__а__") or None
+        must_mask: Bitmask of required letters
+        excluded_mask: Bitmask of excluded letters
+        position_bans: Per-position bitmasks of antipattern bans
+        must_have_other: Required characters outside the alphabet
 
     Returns:
         List of conflict messages (empty if no conflicts)
     """
     msgs: List[str] = []
 
-    if not pattern:
-        pattern_letters: Set[str] = set()
-    else:
-        pattern_letters = {ch for ch in pattern if ch != '_'}
+    fixed = [(i, ch) for i, ch in enumerate(pattern or '') if ch != '_']
+    pattern_mask = letters_mask(ch for _, ch in fixed) & ~UNKNOWN_BIT
 
     # Check if pattern requires excluded letters
-    if pattern_letters & excluded:
+    if pattern_mask & excluded_mask:
         msgs.append(
-            f"Pattern requires {sorted(pattern_letters & excluded)}, but they are excluded"
+            f"Pattern requires {mask_letters(pattern_mask & excluded_mask)}, but they are excluded"
         )
 
     # Check if pattern conflicts with antipattern
-    if antipattern_constraints and pattern:
-        for i, ch in enumerate(pattern):
-            if ch == '_':
-                continue
-            if antipattern_constraints[i] and ch in antipattern_constraints[i]:
-                msgs.append(
-                    f"Position {i+1}: required letter '{ch}' is forbidden by antipattern"
-                )
+    for i, ch in fixed:
+        if ch in LETTER_INDEX and position_bans[i] >> LETTER_INDEX[ch] & 1:
+            msgs.append(
+                f"Position {i+1}: required letter '{ch}' is forbidden by antipattern"
+            )
 
     # Check if there's enough space for must_have letters
-    free_positions = 5 - len(pattern_letters) if pattern else 5
-    pattern_letters_in_must_have = pattern_letters & must_have
-    remaining_must_have = must_have - pattern_letters_in_must_have
-    if len(remaining_must_have) > free_positions:
+    pattern_chars = {ch for _, ch in fixed}
+    free_positions = 5 - len(pattern_chars)
+    remaining_must_have = (
+        (must_mask & ~pattern_mask & ~UNKNOWN_BIT).bit_count()
+        + len(must_have_other - pattern_chars)
+    )
+    if remaining_must_have > free_positions:
         msgs.append(
-            f"Not enough free positions: need to place {len(remaining_must_have)} "
+            f"Not enough free positions: need to place {remaining_must_have} "
             f"required letters in {free_positions} positions"
         )
 
@@ -139,9 +211,6 @@ def parse_input(input_text: str) -> Dict[str, str]:
     Returns:
         Dictionary with keys: excluded, included, pattern, antipattern
     """
-    # Split by whitespace
-    args = input_text.split()
-
     result = {
         "excluded": "",
         "included": "",
@@ -149,25 +218,53 @@ def parse_input(input_text: str) -> Dict[str, str]:
         "antipattern": "",
     }
 
-    for arg in args:
-        if arg.startswith('-'):
-            # Excluded letters (but not flags like --help)
-            if not arg.startswith('--'):
-                result["excluded"] = arg[1:]  # remove '-'
-        elif arg.startswith('+'):
-            # Required letters
-            result["included"] = arg[1:]  # remove '+'
-        elif len(arg) == 5 and '_' in arg:
-            # Pattern (5 characters with underscore)
-            result["pattern"] = arg
-        elif any(ch.isdigit() for ch in arg):
-            # Antipattern (contains digits)
-            result["antipattern"] = arg
-        # Otherwise ignore (or could add to excluded by default)
+    # Single regex pass; later arguments of the same kind win
+    for match in _TOKEN_RE.finditer(input_text):
+        kind = match.lastgroup
+        if kind:
+            result[kind] = match.group(kind)
 
     return result
 
 
+def _lower_same_length(arg: str) -> str:
+    """
+    Lowercase an argument unless that changes its length (e.g. 'İ' → 'i̇'),
+    since argument kinds are told apart by length.
+    """
+    lowered = arg.lower()
+    return lowered if len(lowered) == len(arg) else arg
+
+
+def normalize_query(input_text: str) -> str:
+    """
+    Build a canonical form of a query, e.g. for use as a cache key.
+
+    Recognized arguments are emitted in a fixed order and lowercased, so that
+    "-нзф +ки" and "+ки  -НЗФ" normalize to the same string. Parsing the
+    result gives the same search parameters as parsing the original text.
+
+    Args:
+        input_text: User input string
+
+    Returns:
+        Normalized query string
+    """
+    params = parse_input(input_text)
+
+    tokens: List[str] = []
+    if params["excluded"]:
+        tokens.append("-" + _lower_same_length(params["excluded"]))
+    if params["included"]:
+        tokens.append("+" + _lower_same_length(params["included"]))
+    if params["pattern"]:
+        tokens.append(_lower_same_length(params["pattern"]))
+    if params["antipattern"]:
+        tokens.append(_lower_same_length(params["antipattern"]))
+
+    return " ".join(tokens)
+
+
 def get_search_params(input_text: str) -> Dict:
     """
     Parse input and prepare search parameters.
@@ -197,7 +294,13 @@ def get_search_params(input_text: str) -> Dict:
     antipattern = raw_antipattern.lower() if raw_antipattern else None
     antipattern_constraints = parse_antipattern(antipattern)
 
-    conflicts = check_conflicts(pattern, must_have, excluded, antipattern_constraints)
+    conflicts = check_conflicts(
+        pattern,
+        letters_mask(must_have),
+        letters_mask(excluded),
+        antipattern_masks(antipattern_constraints),
+        {ch for ch in must_have if ch not in LETTER_INDEX},
+    )
 
     return {
         'excluded': excluded,
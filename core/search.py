@@ -8,6 +8,10 @@ Filters words based on excluded letters, must-have letters, pattern, and antipat
 
 from typing import Dict, List, Optional, Sequence, Set, Tuple
 
+from ._fastfilter import filter_kernel
+from .lexicon import letters_mask
+from .parser import compile_pattern
+
 
 def filter_words(
     words: Sequence[str],
@@ -15,6 +19,7 @@ def filter_words(
     excluded: Set[str],
     pattern: Optional[str] = None,
     antipattern_constraints: Optional[List[Optional[Set[str]]]] = None,
+    index: Optional[Dict[str, list]] = None,
 ) -> Tuple[List[str], Dict[str, int]]:
     """
     Filter words based on search criteria.
@@ -25,48 +30,84 @@ def filter_words(
         excluded: Set of excluded letters (gray in Wordle)
         pattern: Pattern with '_' for unknown positions (green in Wordle)
         antipattern_constraints: Position-specific forbidden letters
+        index: Word index built by build_word_index from these same words
+               (if omitted, words are scanned one by one)
 
     Returns:
         Tuple of (filtered words list, filter statistics dict)
+
+    Raises:
+        ValueError: If index was built for a different number of words
     """
     if not words:
         return [], {"must_have": 0, "excluded": 0, "pattern": 0, "antipattern": 0}
 
+    if index is None:
+        # Building the index costs more than one scan, so don't do it per call
+        return _filter_words_plain(words, must_have, excluded, pattern, antipattern_constraints)
+
+    if index['size'] != len(words):
+        raise ValueError(
+            f"Word index was built for {index['size']} words, got {len(words)}"
+        )
+
+    pattern_codes, forbidden_masks = compile_pattern(pattern, antipattern_constraints, excluded)
+    ids, filtered_stats = filter_kernel(
+        len(words),
+        index['letter_bits'],
+        index['position_bits'],
+        letters_mask(excluded),
+        letters_mask(must_have),
+        pattern_codes,
+        forbidden_masks,
+    )
+
+    return [words[i] for i in ids], filtered_stats
+
+
+def _filter_words_plain(
+    words: Sequence[str],
+    must_have: Set[str],
+    excluded: Set[str],
+    pattern: Optional[str],
+    antipattern_constraints: Optional[List[Optional[Set[str]]]],
+) -> Tuple[List[str], Dict[str, int]]:
+    """Filter words with a per-word scan (used when no index is given)."""
     result: List[str] = []
     filtered_stats = {"must_have": 0, "excluded": 0, "pattern": 0, "antipattern": 0}
+    fixed = [(i, ch) for i, ch in enumerate(pattern or '') if ch != '_']
+    banned = [(i, b) for i, b in enumerate(antipattern_constraints or []) if b]
 
     for word in words:
         # Filter: excluded letters
-        if excluded and any(ch in excluded for ch in word):
+        if excluded and not excluded.isdisjoint(word):
             filtered_stats["excluded"] += 1
             continue
 
         # Filter: must_have letters
-        if must_have and not must_have.issubset(set(word)):
+        if must_have and not must_have.issubset(word):
             filtered_stats["must_have"] += 1
             continue
 
         # Filter: pattern (green positions)
-        if pattern:
-            ok = True
-            for i, ch in enumerate(pattern):
-                if ch != '_' and word[i] != ch:
-                    ok = False
-                    break
-            if not ok:
-                filtered_stats["pattern"] += 1
-                continue
+        ok = True
+        for i, ch in fixed:
+            if word[i] != ch:
+                ok = False
+                break
+        if not ok:
+            filtered_stats["pattern"] += 1
+            continue
 
         # Filter: antipattern (positional bans)
-        if antipattern_constraints:
-            violation = False
-            for i, banned in enumerate(antipattern_constraints):
-                if banned and word[i] in banned:
-                    violation = True
-                    break
-            if violation:
-                filtered_stats["antipattern"] += 1
-                continue
+        violation = False
+        for i, b in banned:
+            if word[i] in b:
+                violation = True
+                break
+        if violation:
+            filtered_stats["antipattern"] += 1
+            continue
 
         result.append(word)
 
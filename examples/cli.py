@@ -28,10 +28,9 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from core import (
-    load_lexicon,
+    load_indexed_lexicon,
     get_search_params,
     filter_words,
-    sort_by_frequency,
 )
 
 
@@ -56,7 +55,7 @@ Examples:
     p.add_argument(
         "--sort",
         choices=["freq", "alpha", "none"],
-        help="Sort results (freq=frequency, alpha=alphabetical, none=original order)"
+        help="Sort results (freq=frequency, alpha=alphabetical, none=lexicon order)"
     )
 
     # Use parse_known_args to handle -abc style arguments
@@ -80,7 +79,7 @@ def main():
     # Load lexicon
     lexicon_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'lexicon_ru_5.jsonl.gz')
     try:
-        all_words, freq_map = load_lexicon(lexicon_path)
+        all_words, freq_map, word_index = load_indexed_lexicon(lexicon_path)
     except FileNotFoundError as e:
         print(f"Error: {e}")
         return
@@ -109,7 +108,8 @@ def main():
         params['must_have'],
         params['excluded'],
         params['pattern'],
-        params['antipattern_constraints']
+        params['antipattern_constraints'],
+        index=word_index,
     )
 
     print("\nFiltering:")
@@ -129,7 +129,7 @@ def main():
 
     if sort_mode == 'freq':
         if freq_map:
-            filtered_words = sort_by_frequency(filtered_words, freq_map)
+            # load_lexicon already orders words by frequency
             print("Sorting: by frequency (Zipf)")
         else:
             filtered_words = sorted(filtered_words)
@@ -138,7 +138,7 @@ def main():
         filtered_words = sorted(filtered_words)
         print("Sorting: alphabetical")
     else:
-        print("Sorting: none (original order)")
+        print("Sorting: none (lexicon order)")
 
     # Display results
     if filtered_words:
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prebuild the word index so the bot can skip parsing the lexicon on startup.
+
+Usage:
+  python scripts/build_lexicon.py [lexicon_path]
+
+Writes data/lexicon_ru_5.pkl next to the lexicon (rerun after updating it).
+"""
+
+import sys
+import os
+
+# Add parent directory to path for core imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core import save_prebuilt_lexicon
+
+
+def main():
+    """Main entry point."""
+    default_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'lexicon_ru_5.jsonl.gz')
+    lexicon_path = sys.argv[1] if len(sys.argv) > 1 else default_path
+
+    try:
+        prebuilt_path = save_prebuilt_lexicon(lexicon_path)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"Prebuilt index written to {prebuilt_path}")
+
+
+if __name__ == "__main__":
+    main()